@@ -38,6 +38,15 @@ DEFAULT_LAMBDA = 1e-5
 # default regularization - L2
 DEFAULT_NORM = 2
 
+# default for concatenating params with the same trailing dims and weight before computing the norm
+DEFAULT_FUSED_PARAMS = False
+
+# default for compiling the regularization ops with XLA
+DEFAULT_JIT_COMPILE = False
+
+# params with more elements than this are reduced on their own: stacking would copy them in full
+MAX_STACKED_PARAM_SIZE = 100000
+
 
 class Regularizer(abc.ABC):
     """Abstract class for Regularizer.
@@ -84,13 +93,7 @@ class Regularizer(abc.ABC):
         param_value:
             the value of the corresponding state
         """
-        try:
-            param_value = REGULARIZER_REGISTRY[self.name].class_params.get(param_name)
-            return param_value
-        except KeyError as e:
-            msg = 'Invalid Key.\n{}'.format(e)
-            logger.error(msg)
-            raise Exception(msg)
+        return self.class_params.get(param_name)
 
     def _init_hyperparams(self, hyperparam_dict):
         """Initializes the hyperparameters needed by the algorithm.
@@ -103,6 +106,18 @@ class Regularizer(abc.ABC):
         logger.error('This function is a placeholder in an abstract class')
         raise NotImplementedError("This function is a placeholder in an abstract class")
 
+    def _inputs_check(self, trainable_params):
+        """Performs the checks and the pre-processing of the hyperparams that depend on the params to regularize.
+
+        (No TF ops must be created in this function.)
+
+        Parameters
+        ----------
+        trainable_params : list, shape [n]
+            List of trainable params that should be reqularized
+        """
+        pass
+
     def _apply(self, trainable_params):
         """Apply the regularization function. Every inherited class must implement this function.
 
@@ -135,11 +150,12 @@ class Regularizer(abc.ABC):
         loss : tf.Tensor
             Regularization Loss
         """
+        self._inputs_check(trainable_params)
         loss = self._apply(trainable_params)
         return loss
 
 
-@register_regularizer("LP", ['p', 'lambda'])
+@register_regularizer("LP", ['p', 'lambda', 'fused_params', 'jit_compile'])
 class LPRegularizer(Regularizer):
     r"""Performs LP regularization
 
@@ -169,12 +185,18 @@ class LPRegularizer(Regularizer):
 
             - **'lambda'**: (float). Weight of regularization loss for each parameter (default: 1e-5)
             - **'p'**: (int): norm (default: 2)
+            - **'fused_params'**: (bool): concatenate the params that share the trailing dimensions and the weight,
+              and compute their norm in a single op. Uses extra memory for the concatenated copy (default: False)
+            - **'jit_compile'**: (bool): compile the regularization ops with XLA, fusing them into fewer kernels.
+              Requires a TensorFlow build with XLA support (default: False)
 
             Example: ``regularizer_params={'lambda': 1e-5, 'p': 1}``
 
         """
         if regularizer_params is None:
             regularizer_params = {'lambda': DEFAULT_LAMBDA, 'p': DEFAULT_NORM}
+        # shapes of the params for which _inputs_check last prepared the lambdas
+        self._params_shapes = None
         super().__init__(regularizer_params, verbose)
 
     def _init_hyperparams(self, hyperparam_dict):
@@ -192,14 +214,157 @@ class LPRegularizer(Regularizer):
             'p': int
                 Norm of the regularizer (``1`` for L1 regularizer, ``2`` for L2 and so on.) (default:2)
 
+            'fused_params': bool
+                Concatenate along the first axis the params that share the trailing dimensions and the weight,
+                and compute their norm in a single op (default: False).
+
+            'jit_compile': bool
+                Compile the regularization ops with XLA (default: False).
+
         """
         self._regularizer_parameters['lambda'] = hyperparam_dict.get('lambda', DEFAULT_LAMBDA)
         self._regularizer_parameters['p'] = hyperparam_dict.get('p', DEFAULT_NORM)
+        self._regularizer_parameters['fused_params'] = hyperparam_dict.get('fused_params', DEFAULT_FUSED_PARAMS)
+        self._regularizer_parameters['jit_compile'] = hyperparam_dict.get('jit_compile', DEFAULT_JIT_COMPILE)
         if not isinstance(self._regularizer_parameters['p'], (int, np.integer)):
             msg = 'Invalid value for regularizer parameter p:{}. Supported type int, np.int32 or np.int64'.format(
                 self._regularizer_parameters['p'])
             logger.error(msg)
             raise Exception(msg)
+        if not np.isscalar(self._regularizer_parameters['lambda']) and \
+                not isinstance(self._regularizer_parameters['lambda'], list):
+            logger.error('Regularizer weight must be a scalar or a list with length equal to number of params passes')
+            raise ValueError(
+                "Regularizer weight must be a scalar or a list with length equal to number of params passes")
+
+    def _inputs_check(self, trainable_params):
+        """Broadcasts the regularization weight to the params and checks that they match.
+
+        The checks are skipped if the params have the same shapes and dtypes as in the previous call.
+
+        Parameters
+        ----------
+        trainable_params : list, shape [n]
+            List of trainable params that should be reqularized.
+        """
+        # partially known shapes are kept as they are, since fused groups depend on the trailing dims
+        params_shapes = [(tuple(param.get_shape().as_list()) if param.get_shape().ndims is not None else None,
+                          param.dtype.base_dtype)
+                         for param in trainable_params]
+        if params_shapes == self._params_shapes:
+            return
+
+        # the hyperparam is left untouched, the broadcast weights are only stored in self._lambdas
+        lambdas = self._regularizer_parameters['lambda']
+        if np.isscalar(lambdas):
+            lambdas = np.full(len(trainable_params), lambdas, dtype=np.float32)
+        elif len(lambdas) != len(trainable_params):
+            logger.error('Regularizer weight must be a scalar or a list with length equal to number of params passes')
+            raise ValueError(
+                "Regularizer weight must be a scalar or a list with length equal to number of params passes")
+        else:
+            lambdas = np.asarray(lambdas, dtype=np.float32)
+
+        # small params sharing the same static shape and dtype are stacked and reduced together in _apply,
+        # or, if fused_params is set, those sharing the trailing dims, dtype and weight are concatenated.
+        # params with a zero weight are left out of the graph
+        fused = self._regularizer_parameters['fused_params']
+        groups = {}
+        for i, param in enumerate(trainable_params):
+            if lambdas[i] == 0:
+                continue
+            shape = param.get_shape()
+            if fused and shape.ndims and shape[1:].is_fully_defined():
+                key = (tuple(shape[1:].as_list()), param.dtype.base_dtype, lambdas[i])
+            elif not fused and shape.is_fully_defined() and shape.num_elements() <= MAX_STACKED_PARAM_SIZE:
+                key = (tuple(shape.as_list()), param.dtype.base_dtype)
+            else:
+                key = i
+            groups.setdefault(key, []).append(i)
+        self._groups = list(groups.values())
+
+        # lambdas are stored in the same order as the norms computed by _apply
+        if fused:
+            self._lambdas = lambdas[[group[0] for group in self._groups]]
+        else:
+            self._lambdas = lambdas[[i for group in self._groups for i in group]]
+        self._params_shapes = params_shapes
+
+    def _norm(self, param, axis=None):
+        """Computes the p-th power of the p-norm of a param.
+
+        Small values of p are expanded into products, to avoid the exp/log kernel of ``tf.pow``.
+        For half precision params (float16, bfloat16) only the absolute value is computed in their own dtype,
+        while the powers and the sum are computed in float32.
+
+        Parameters
+        ----------
+        param : tf.Tensor
+            The param to regularize.
+        axis : int or None
+            If None, all the dimensions are reduced. If 1, param must have rank 2 and the norm of each row is returned.
+
+        Returns
+        -------
+        norm : tf.Tensor, dtype float32
+            Sum of the absolute values of the param elements, raised to the power of p.
+        """
+        p = self._regularizer_parameters['p']
+        low_precision = param.dtype.base_dtype in (tf.float16, tf.bfloat16)
+
+        if p == 2 and not low_precision:
+            if axis is None:
+                norm = 2.0 * tf.nn.l2_loss(param)
+            else:
+                norm = tf.reduce_sum(tf.square(param), axis=axis)
+        else:
+            abs_param = tf.abs(param)
+            if low_precision:
+                # the powers of large values would overflow in half precision
+                abs_param = tf.cast(abs_param, tf.float32)
+
+            if p == 1:
+                elems = abs_param
+            elif p == 2:
+                elems = tf.square(abs_param)
+            elif p == 3:
+                elems = tf.square(abs_param) * abs_param
+            else:
+                elems = tf.pow(abs_param, p)
+            norm = tf.reduce_sum(elems, axis=axis)
+
+        return tf.cast(norm, tf.float32)
+
+    def compute_norms_numpy(self, trainable_params):
+        """Computes the p-th power of the p-norm of each param with NumPy.
+
+        Useful to monitor the regularization of trained params (e.g. ``model.trained_model_params``)
+        without building TF ops or running a session.
+
+        Parameters
+        ----------
+        trainable_params : list, shape [n]
+            List of params, as np.ndarray.
+
+        Returns
+        -------
+        norms : ndarray, shape [n]
+            The norm of each param. The regularization loss is ``np.dot(lambda, norms)``.
+        """
+        p = self._regularizer_parameters['p']
+        norms = []
+        for param in trainable_params:
+            flat = np.ravel(param)
+            if p == 1:
+                norms.append(np.sum(np.abs(flat)))
+            elif p == 2:
+                norms.append(np.dot(flat, flat))
+            elif p == 3:
+                abs_flat = np.abs(flat)
+                norms.append(np.dot(abs_flat, flat * flat))
+            else:
+                norms.append(np.sum(np.abs(flat) ** p))
+        return np.array(norms)
 
     def _apply(self, trainable_params):
         """Apply the regularizer to the params.
@@ -211,23 +376,42 @@ class LPRegularizer(Regularizer):
 
         Returns
         -------
-        loss : tf.Tensor
-            Regularization Loss
+        loss : tf.Tensor or float
+            Regularization Loss (``0.0`` if all the weights are zero)
 
         """
-        if np.isscalar(self._regularizer_parameters['lambda']):
-            self._regularizer_parameters['lambda'] = [self._regularizer_parameters['lambda']] * len(trainable_params)
-        elif isinstance(self._regularizer_parameters['lambda'], list) and len(
-                self._regularizer_parameters['lambda']) == len(trainable_params):
-            pass
-        else:
-            logger.error('Regularizer weight must be a scalar or a list with length equal to number of params passes')
-            raise ValueError(
-                "Regularizer weight must be a scalar or a list with length equal to number of params passes")
+        if not self._groups:
+            return 0.0
+
+        if self._regularizer_parameters['jit_compile']:
+            with tf.xla.experimental.jit_scope():
+                return self._weighted_norms(trainable_params)
+
+        return self._weighted_norms(trainable_params)
+
+    def _weighted_norms(self, trainable_params):
+        """Computes the norms of the groups of params prepared by _inputs_check and weights them.
+
+        Parameters
+        ----------
+        trainable_params : list, shape [n]
+            List of trainable params that should be reqularized.
 
-        loss_reg = 0
-        for i in range(len(trainable_params)):
-            loss_reg += (self._regularizer_parameters['lambda'][i] * tf.reduce_sum(
-                tf.pow(tf.abs(trainable_params[i]), self._regularizer_parameters['p'])))
+        Returns
+        -------
+        loss : tf.Tensor
+            Regularization Loss
 
-        return loss_reg
+        """
+        norms = []
+        for group in self._groups:
+            if len(group) == 1:
+                norms.append(tf.expand_dims(self._norm(trainable_params[group[0]]), 0))
+            elif self._regularizer_parameters['fused_params']:
+                concat = tf.concat([trainable_params[i] for i in group], axis=0)
+                norms.append(tf.expand_dims(self._norm(concat), 0))
+            else:
+                stacked = tf.stack([trainable_params[i] for i in group])
+                norms.append(self._norm(tf.reshape(stacked, [len(group), -1]), axis=1))
+
+        return tf.tensordot(tf.constant(self._lambdas), tf.concat(norms, axis=0), axes=1)
@@ -6,6 +6,7 @@
 #     http://www.apache.org/licenses/LICENSE-2.0
 #
 import numpy as np
+import pytest
 import tensorflow as tf
 from ampligraph.latent_features import REGULARIZER_REGISTRY
 
@@ -42,3 +43,172 @@ def test_l2_regularizer():
         np.testing.assert_array_equal(out, 15.0)
         out = sess.run(l2_obj2.apply([p1, p2]))
         np.testing.assert_array_equal(out, 42.0)
+
+
+def test_l3_regularizer():
+    l3_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([1, -1, 1], dtype=tf.float32)
+    p2 = tf.constant([2, -2, 2], dtype=tf.float32)
+    lambda_1 = 1.0
+    lambda_2 = [2.0, 3.0]
+    l3_obj1 = l3_class({'lambda': lambda_1, 'p': 3})
+    l3_obj2 = l3_class({'lambda': lambda_2, 'p': 3})
+
+    with tf.Session() as sess:
+        out = sess.run(l3_obj1.apply([p1, p2]))
+        np.testing.assert_array_equal(out, 27.0)
+        out = sess.run(l3_obj2.apply([p1, p2]))
+        np.testing.assert_array_equal(out, 78.0)
+
+
+def test_lp_regularizer_mixed_shapes():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([[1, -1, 1], [1, 1, -1]], dtype=tf.float32)
+    p2 = tf.constant([2, -2, 2], dtype=tf.float32)
+    p3 = tf.constant([[-1, 1, 1], [1, 2, 1]], dtype=tf.float32)
+    lp_obj = lp_class({'lambda': [1.0, 2.0, 3.0], 'p': 2})
+
+    with tf.Session() as sess:
+        out = sess.run(lp_obj.apply([p1, p2, p3]))
+        np.testing.assert_array_equal(out, 6.0 + 24.0 + 27.0)
+
+
+def test_lp_regularizer_invalid_lambda():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    with pytest.raises(ValueError):
+        lp_class({'lambda': (1.0, 2.0), 'p': 2})
+
+    p1 = tf.constant([1, -1, 1], dtype=tf.float32)
+    lp_obj = lp_class({'lambda': [1.0, 2.0], 'p': 2})
+    with pytest.raises(ValueError):
+        lp_obj.apply([p1])
+
+
+def test_lp_regularizer_compute_norms_numpy():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = np.array([[1, -1, 1], [1, 1, -1]], dtype=np.float32)
+    p2 = np.array([2, -2, 2], dtype=np.float32)
+    for p in [1, 2, 3, 4]:
+        lp_obj = lp_class({'lambda': [1.0, 2.0], 'p': p})
+        norms = lp_obj.compute_norms_numpy([p1, p2])
+        with tf.Session() as sess:
+            out = sess.run(lp_obj.apply([tf.constant(p1), tf.constant(p2)]))
+        np.testing.assert_allclose(norms, [6.0, 3 * 2 ** p])
+        np.testing.assert_allclose(np.dot([1.0, 2.0], norms), out)
+
+
+def test_lp_regularizer_mixed_precision():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([1, -1, 1], dtype=tf.float16)
+    p2 = tf.constant([2, -2, 2], dtype=tf.float32)
+    p3 = tf.constant([2, -2, 2], dtype=tf.float64)
+    for p, expected in [(1, 3.0 + 12.0 + 18.0), (2, 3.0 + 24.0 + 36.0), (3, 3.0 + 48.0 + 72.0)]:
+        lp_obj = lp_class({'lambda': [1.0, 2.0, 3.0], 'p': p})
+        loss = lp_obj.apply([p1, p2, p3])
+        assert loss.dtype == tf.float32
+        with tf.Session() as sess:
+            out = sess.run(loss)
+        np.testing.assert_array_equal(out, expected)
+
+
+def test_lp_regularizer_zero_lambda():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([1, -1, 1], dtype=tf.float32)
+    p2 = tf.constant([2, -2, 2], dtype=tf.float32)
+
+    assert lp_class({'lambda': 0.0, 'p': 2}).apply([p1, p2]) == 0.0
+
+    with tf.Session() as sess:
+        out = sess.run(lp_class({'lambda': [0.0, 2.0], 'p': 2}).apply([p1, p2]))
+        np.testing.assert_array_equal(out, 24.0)
+
+
+def test_lp_regularizer_fused_params():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([[1, -1, 1], [1, 1, -1]], dtype=tf.float32)
+    p2 = tf.constant([[2, -2, 2]], dtype=tf.float32)
+    p3 = tf.constant([[-1, 1], [1, 2]], dtype=tf.float32)
+    for p in [1, 2, 3]:
+        lp_obj = lp_class({'lambda': [1.0, 1.0, 3.0], 'p': p})
+        fused_obj = lp_class({'lambda': [1.0, 1.0, 3.0], 'p': p, 'fused_params': True})
+        with tf.Session() as sess:
+            out = sess.run(lp_obj.apply([p1, p2, p3]))
+            out_fused = sess.run(fused_obj.apply([p1, p2, p3]))
+        assert len(fused_obj._groups) == 2
+        np.testing.assert_array_equal(out, out_fused)
+
+
+def test_lp_regularizer_scalar_lambda_not_mutated():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([1, -1, 1], dtype=tf.float32)
+    p2 = tf.constant([2, -2], dtype=tf.float32)
+    lp_obj = lp_class({'lambda': 2.0, 'p': 1})
+
+    with tf.Session() as sess:
+        np.testing.assert_array_equal(sess.run(lp_obj.apply([p1, p2])), 14.0)
+        np.testing.assert_array_equal(sess.run(lp_obj.apply([p1])), 6.0)
+    assert lp_obj._regularizer_parameters['lambda'] == 2.0
+
+
+def test_lp_regularizer_jit_compile():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([1, -1, 1], dtype=tf.float32)
+    p2 = tf.constant([2, -2, 2], dtype=tf.float32)
+    lp_obj = lp_class({'lambda': [2.0, 3.0], 'p': 2, 'jit_compile': True})
+
+    with tf.Session() as sess:
+        out = sess.run(lp_obj.apply([p1, p2]))
+        np.testing.assert_array_equal(out, 42.0)
+
+
+def test_lp_regularizer_large_params_not_stacked():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.ones([400, 300], dtype=tf.float32)
+    p2 = tf.ones([400, 300], dtype=tf.float32)
+    lp_obj = lp_class({'lambda': [1.0, 2.0], 'p': 2})
+
+    with tf.Session() as sess:
+        out = sess.run(lp_obj.apply([p1, p2]))
+    assert lp_obj._groups == [[0], [1]]
+    np.testing.assert_array_equal(out, 3 * 400 * 300)
+
+
+def test_lp_regularizer_dtype_change():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    p1 = tf.constant([[1, -1, 1], [1, 1, -1]], dtype=tf.float32)
+    p2 = tf.constant([[2, -2, 2], [2, 2, -2]], dtype=tf.float32)
+    p3 = tf.constant([[2, -2, 2], [2, 2, -2]], dtype=tf.float16)
+    lp_obj = lp_class({'lambda': 1.0, 'p': 1})
+
+    with tf.Session() as sess:
+        np.testing.assert_array_equal(sess.run(lp_obj.apply([p1, p2])), 18.0)
+        np.testing.assert_array_equal(sess.run(lp_obj.apply([p1, p3])), 18.0)
+
+
+def test_lp_regularizer_half_precision_overflow():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    # 300 ** 2 and 300 ** 3 overflow in float16
+    p1 = tf.constant([300, -300], dtype=tf.float16)
+    for p in [2, 3, 4]:
+        lp_obj = lp_class({'lambda': 1.0, 'p': p})
+        with tf.Session() as sess:
+            out = sess.run(lp_obj.apply([p1]))
+        np.testing.assert_allclose(out, 2 * 300.0 ** p, rtol=1e-6)
+
+
+def test_lp_regularizer_fused_params_partial_shapes():
+    lp_class = REGULARIZER_REGISTRY['LP']
+    fused_obj = lp_class({'lambda': 1.0, 'p': 1, 'fused_params': True})
+    p1 = tf.placeholder(tf.float32, shape=[None, 3])
+    p2 = tf.placeholder(tf.float32, shape=[None, 3])
+    p3 = tf.placeholder(tf.float32, shape=[None, 2])
+
+    loss_1 = fused_obj.apply([p1, p2])
+    assert fused_obj._groups == [[0, 1]]
+    loss_2 = fused_obj.apply([p1, p3])
+    assert fused_obj._groups == [[0], [1]]
+
+    feed_dict = {p1: [[1, -1, 1]], p2: [[2, -2, 2]], p3: [[3, -3]]}
+    with tf.Session() as sess:
+        np.testing.assert_array_equal(sess.run(loss_1, feed_dict=feed_dict), 9.0)
+        np.testing.assert_array_equal(sess.run(loss_2, feed_dict=feed_dict), 9.0)